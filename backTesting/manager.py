@@ -1,25 +1,47 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
 import glob
 import os
 import logging
 import sys
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
 from typing import List, Dict, Optional
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import consolidated analyzer and config
+# Import consolidated analyzer, compiled kernels and config
 from analyzer import analyze_stock_backtest
+from backTesting._kernels import simulate_kernel
 from config import (
     ATR_MULTIPLE, TAKE_PROFIT_MULTIPLE, EXPIRY_DAYS, START_DATE,
-    DATA_DIRECTORY, BACKTEST_RESULTS_PREFIX, MARKET_SUFFIXES, NUMERIC_COLUMNS
+    DATA_DIRECTORY, BACKTEST_RESULTS_FILE, MARKET_SUFFIXES, NUMERIC_COLUMNS
 )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Parsed once at import; re-parsing the start date per file added up
+START_TS = pd.to_datetime(START_DATE)
+
+# Explicit column types for the Arrow CSV reader: skips the pandas
+# type-inference pass and parses dates natively instead of via Python objects
+_CSV_CONVERT_OPTIONS = pacsv.ConvertOptions(column_types={
+    "Date": pa.timestamp("ns"),
+    "Open": pa.float64(),
+    "High": pa.float64(),
+    "Low": pa.float64(),
+    "Close": pa.float64(),
+    "Adj Close": pa.float64(),
+    "Volume": pa.float64(),
+})
+
 def get_market_from_filename(filename: str) -> str:
     """
     Extracts the market name from the filename based on its suffix.
@@ -30,33 +52,44 @@ def get_market_from_filename(filename: str) -> str:
     Returns:
         str: The market name or "Unknown" if not found.
     """
-    ticker_part = filename.split("_")[0]
+    ticker_part, _, _ = filename.partition("_")
+    _, sep, suffix = ticker_part.rpartition(".")
 
-    if "." not in ticker_part:
+    if not sep:
         return "USA"
 
-    suffix = ticker_part.split(".")[-1]
     return MARKET_SUFFIXES.get(suffix.upper(), "Unknown")
 
 
-def validate_and_clean_dataframe(df: pd.DataFrame, start_date: str) -> pd.DataFrame:
+def validate_and_clean_dataframe(df: pd.DataFrame, start_ts: pd.Timestamp = START_TS) -> pd.DataFrame:
     """Validate and clean the dataframe for backtesting."""
     try:
-        # Ensure the Date column is valid and sorted
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df = df.dropna(subset=["Date"])
-        df = df.sort_values("Date").reset_index(drop=True)
-
-        # Filter data based on the start date
-        df = df[df["Date"] >= pd.to_datetime(start_date)]
+        # Coerce dtypes first; the conversions are gated on dtype so frames
+        # that arrive typed from the Arrow/Parquet readers skip the reparse
+        # (and its full-column copy) entirely
+        if not is_datetime64_any_dtype(df["Date"]):
+            df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns and not is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors="coerce")
 
-        # Ensure numeric columns are valid
+        # One fused validity mask and a single filtering pass instead of
+        # separate dropna calls for Date and the numeric columns
+        mask = df["Date"].notna()
         for col in NUMERIC_COLUMNS:
             if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-        
-        df = df.dropna(subset=[col for col in NUMERIC_COLUMNS if col in df.columns])
-        
+                mask &= df[col].notna()
+        if not mask.all():
+            df = df[mask]
+
+        if not df["Date"].is_monotonic_increasing:
+            df = df.sort_values("Date").reset_index(drop=True)
+
+        # Filter data based on the start date - the column is sorted, so a
+        # binary search plus slice replaces the full boolean mask and copy
+        first_row = df["Date"].searchsorted(start_ts, side="left")
+        df = df.iloc[first_row:].reset_index(drop=True)
+
         if df.empty:
             raise ValueError("No valid data after cleaning")
             
@@ -68,14 +101,20 @@ def validate_and_clean_dataframe(df: pd.DataFrame, start_date: str) -> pd.DataFr
 
 
 def process_single_file(file_path: str) -> Optional[pd.DataFrame]:
-    """Process a single CSV file and return results."""
+    """Process a single data file (Parquet or legacy CSV) and return results."""
     try:
         filename = os.path.basename(file_path)
         market = get_market_from_filename(filename)
         logger.info(f"Processing {filename} (Market: {market})")
 
-        df = pd.read_csv(file_path)
-        df = validate_and_clean_dataframe(df, START_DATE)
+        if file_path.endswith(".parquet"):
+            # Parquet preserves dtypes, so Date/numeric re-coercion is a no-op
+            df = pd.read_parquet(file_path)
+        else:
+            # Arrow's multithreaded CSV reader with the explicit schema above;
+            # dates and numerics arrive already typed
+            df = pacsv.read_csv(file_path, convert_options=_CSV_CONVERT_OPTIONS).to_pandas()
+        df = validate_and_clean_dataframe(df)
 
         # Analyze stock for signals
         signals = analyze_stock_backtest(df)
@@ -96,7 +135,7 @@ def process_single_file(file_path: str) -> Optional[pd.DataFrame]:
         simulate_trades(df, positions)
 
         # Create results DataFrame
-        results_df = pd.DataFrame(positions)
+        results_df = positions.to_dataframe()
         return results_df, filename
 
     except Exception as e:
@@ -104,94 +143,163 @@ def process_single_file(file_path: str) -> Optional[pd.DataFrame]:
         return None
 
 
-def create_positions_from_signals(signals: List[Dict], market: str) -> List[Dict]:
+@dataclass
+class Positions:
+    """
+    Struct-of-arrays position store.
+
+    Parallel NumPy arrays replace the old list of per-position dicts, so
+    the simulator hands contiguous buffers straight to the kernel instead
+    of pulling each field through a dict lookup per position.
+    """
+    entry_date: np.ndarray    # datetime64[ns]
+    entry_price: np.ndarray   # float64
+    max_price: np.ndarray     # float64
+    stop_loss: np.ndarray     # float64
+    take_profit: np.ndarray   # float64
+    expiry_date: np.ndarray   # datetime64[ns]
+    status: np.ndarray        # object ("OPEN" / exit label)
+    exit_date: np.ndarray     # datetime64[ns], NaT while open
+    exit_price: np.ndarray    # float64, NaN while open
+    pct_change: np.ndarray    # float64, NaN while open
+    atr: np.ndarray           # float64
+    market: str
+
+    def __len__(self) -> int:
+        return self.entry_price.size
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Materialize the arrays as the results DataFrame, same column
+        order the dict-based positions produced."""
+        return pd.DataFrame({
+            "entry_date": self.entry_date,
+            "entry_price": self.entry_price,
+            "max_price": self.max_price,
+            "stop_loss": self.stop_loss,
+            "take_profit": self.take_profit,
+            "expiry_date": self.expiry_date,
+            "status": self.status,
+            "exit_date": self.exit_date,
+            "exit_price": self.exit_price,
+            "pct_change": self.pct_change,
+            "atr": self.atr,
+            "market": self.market,
+        })
+
+
+def create_positions_from_signals(signals: List[Dict], market: str) -> Positions:
     """Create trading positions from buy signals."""
-    positions = []
-    
+    valid = []
     for signal in signals:
         if signal['action'] == "BUY":
             atr = signal.get("atr")
             if atr is None or pd.isna(atr):
                 logger.warning(f"ATR not valid - skipping trade on {signal['date']}")
                 continue
+            valid.append(signal)
 
-            stop_loss = signal['price'] - (ATR_MULTIPLE * atr)
-            take_profit = signal['price'] + (TAKE_PROFIT_MULTIPLE * atr)
-            expiry_date = signal['date'] + timedelta(days=EXPIRY_DAYS)
-
-            positions.append({
-                "entry_date": signal['date'],
-                "entry_price": signal['price'],
-                "max_price": signal['price'],
-                "stop_loss": stop_loss,
-                "take_profit": take_profit,
-                "expiry_date": expiry_date,
-                "status": "OPEN",
-                "exit_date": None,
-                "exit_price": None,
-                "pct_change": None,
-                "atr": atr,
-                "market": market
-            })
-    
-    return positions
+    n = len(valid)
+    entry_date = np.array([np.datetime64(s['date']) for s in valid], dtype="datetime64[ns]")
+    entry_price = np.array([s['price'] for s in valid], dtype=np.float64)
+    atr = np.array([s['atr'] for s in valid], dtype=np.float64)
 
+    return Positions(
+        entry_date=entry_date,
+        entry_price=entry_price,
+        max_price=entry_price.copy(),
+        stop_loss=entry_price - ATR_MULTIPLE * atr,
+        take_profit=entry_price + TAKE_PROFIT_MULTIPLE * atr,
+        expiry_date=entry_date + np.timedelta64(EXPIRY_DAYS, "D"),
+        status=np.full(n, "OPEN", dtype=object),
+        exit_date=np.full(n, np.datetime64("NaT"), dtype="datetime64[ns]"),
+        exit_price=np.full(n, np.nan),
+        pct_change=np.full(n, np.nan),
+        atr=atr,
+        market=market,
+    )
 
-def simulate_trades(df: pd.DataFrame, positions: List[Dict]) -> None:
-    """Simulate trading execution for all positions."""
-    for _, row in df.iterrows():
-        current_date = row["Date"]
-        low = row["Low"] 
-        high = row["High"]
-        close = row["Close"]
-        
-        for pos in positions:
-            if pos["status"] != "OPEN":
-                continue
 
-            # Update stop loss based on max price (trailing stop)
-            if high > pos["max_price"]:
-                pos["max_price"] = high
-                pos["stop_loss"] = pos["max_price"] - (ATR_MULTIPLE * pos["atr"])
+_STATUS_LABELS = {1: "EXIT TIME", 2: "STOP LOSS", 3: "TAKE PROFIT"}
+
+
+def simulate_trades(df: pd.DataFrame, positions: Positions) -> None:
+    """
+    Simulate trading execution for all positions.
+
+    The position arrays feed the compiled simulate_kernel directly (fancy
+    indexing on the open subset yields fresh contiguous buffers), and the
+    exit status/date/price results are written back with array assignments.
+    """
+    idx = np.flatnonzero(positions.status == "OPEN")
+    if idx.size == 0:
+        return
+
+    # Normalize to ns before viewing as int64: parquet round-trips come
+    # back as datetime64[us] under pandas 3.x, and µs ticks would never
+    # exceed the ns-typed expiry values inside the kernel
+    dates = df["Date"].to_numpy(dtype="datetime64[ns]")
+    dates_i8 = dates.view(np.int64)
+    highs = df["High"].to_numpy(dtype=np.float64)
+    lows = df["Low"].to_numpy(dtype=np.float64)
+    closes = df["Close"].to_numpy(dtype=np.float64)
+
+    entry_idx = np.searchsorted(dates, positions.entry_date[idx], side="left")
 
-            # Check exit conditions in order of priority
-            if current_date > pos["expiry_date"]:
-                close_position(pos, "EXIT TIME", current_date, close)
-            elif low <= pos["stop_loss"]:
-                close_position(pos, "STOP LOSS", current_date, pos["stop_loss"])
-            elif high >= pos["take_profit"]:
-                close_position(pos, "TAKE PROFIT", current_date, pos["take_profit"])
+    # Loop-invariant trailing-stop offset, computed once per position
+    sl_offset = ATR_MULTIPLE * positions.atr[idx]
 
+    status, exit_bar, exit_price, max_price, stop_loss = simulate_kernel(
+        dates_i8, highs, lows, closes,
+        entry_idx, positions.entry_price[idx], sl_offset,
+        positions.take_profit[idx], positions.expiry_date[idx].view(np.int64)
+    )
 
-def close_position(position: Dict, status: str, exit_date, exit_price: float) -> None:
-    """Close a trading position and calculate returns."""
-    position["status"] = status
-    position["exit_date"] = exit_date
-    position["exit_price"] = exit_price
-    position["pct_change"] = ((exit_price - position["entry_price"]) / position["entry_price"]) * 100
+    positions.max_price[idx] = max_price
+    positions.stop_loss[idx] = stop_loss
+
+    closed = status > 0
+    ci = idx[closed]
+    positions.status[ci] = [_STATUS_LABELS[s] for s in status[closed]]
+    positions.exit_date[ci] = dates[exit_bar[closed]]
+    positions.exit_price[ci] = exit_price[closed]
+    positions.pct_change[ci] = ((exit_price[closed] - positions.entry_price[ci])
+                                / positions.entry_price[ci]) * 100
 
 
 def main():
     """Main backtesting execution function."""
-    # Find all CSV files in the data folder
-    csv_files = glob.glob(f"{DATA_DIRECTORY}/*.csv")
+    # Find all data files in the data folder (Parquet, plus legacy CSV)
+    data_files = glob.glob(f"{DATA_DIRECTORY}/*.parquet") + glob.glob(f"{DATA_DIRECTORY}/*.csv")
 
-    if not csv_files:
-        logger.error(f"No CSV files found in {DATA_DIRECTORY}/")
+    if not data_files:
+        logger.error(f"No data files found in {DATA_DIRECTORY}/")
         return
 
-    logger.info(f"Found {len(csv_files)} files to process")
+    logger.info(f"Found {len(data_files)} files to process")
+
+    # Files are independent, so fan the per-file work out across all cores.
+    # The Numba kernels are cached on disk, so workers don't recompile them.
+    # Results are collected from the parent as each worker finishes and
+    # written as one combined Parquet file instead of a CSV per ticker, so
+    # the stats pass reads a single columnar file back.
+    all_results = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {executor.submit(process_single_file, path): path
+                   for path in data_files}
+
+        for future in as_completed(futures):
+            result = future.result()
+            if result is not None:
+                results_df, filename = result
+                all_results.append(results_df.assign(Ticker=os.path.splitext(filename)[0]))
+
+    if not all_results:
+        logger.warning("No positions produced by any file")
+        return
 
-    # Process each CSV file
-    for file_path in csv_files:
-        result = process_single_file(file_path)
-        
-        if result is not None:
-            results_df, filename = result
-            # Save results to CSV
-            out_filename = f"{BACKTEST_RESULTS_PREFIX}{filename.replace('.csv','')}.csv"
-            results_df.to_csv(out_filename, index=False)
-            logger.info(f"Results exported to '{out_filename}'")
+    combined = pd.concat(all_results, ignore_index=True)
+    combined.to_parquet(BACKTEST_RESULTS_FILE, engine="pyarrow", index=False)
+    logger.info(f"Results for {len(all_results)} files exported to '{BACKTEST_RESULTS_FILE}'")
 
 
 if __name__ == "__main__":
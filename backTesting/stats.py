@@ -1,14 +1,26 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from pyarrow import csv as pacsv
 import glob
 import os
 import logging
 import sys
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+# Polars drives the fast aggregation path; the per-file pandas loop below
+# remains the fallback when it is not installed
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import BACKTEST_RESULTS_PREFIX
+from config import BACKTEST_RESULTS_PREFIX, BACKTEST_RESULTS_FILE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -54,13 +66,14 @@ def process_result_file(file_path: str) -> Optional[Dict]:
         pct_list = closed["pct_change"].tolist()
         market_list = closed["market"].tolist()
 
-        # Extract dates for year grouping
+        # Extract dates for year grouping; the ISO8601 format pins pandas to
+        # its fast parsing path instead of per-element inference
         if "exit_date" in closed.columns and closed["exit_date"].notnull().any():
-            dates = pd.to_datetime(closed["exit_date"], errors="coerce")
+            dates = pd.to_datetime(closed["exit_date"], format="ISO8601", errors="coerce")
         else:
-            dates = pd.to_datetime(closed["entry_date"], errors="coerce")
+            dates = pd.to_datetime(closed["entry_date"], format="ISO8601", errors="coerce")
 
-        years = dates.dt.year.tolist()
+        years = dates.dt.year.to_numpy()
         avg_pct = sum(pct_list) / len(pct_list)
 
         return {
@@ -77,20 +90,144 @@ def process_result_file(file_path: str) -> Optional[Dict]:
         return None
 
 
+def aggregate_with_polars() -> Tuple[List[Dict], List[float], List[str], List[int]]:
+    """
+    Aggregate every result file in one lazy Polars plan.
+
+    scan_csv reads the whole glob in parallel with projection pushdown
+    instead of loading each file through pandas, so hundreds of result
+    files aggregate in a single pass. Returns the same
+    (summary_rows, all_pcts, all_markets, all_years) that the per-file
+    loop produces.
+    """
+    pattern = f"{BACKTEST_RESULTS_PREFIX}*.csv"
+    lf = pl.scan_csv(pattern, include_file_paths="File")
+
+    # Per-file trade counts and averages (mean skips nulls, so files with
+    # no closed trades report null, matching the loop's None)
+    per_file = (
+        lf.group_by("File")
+        .agg(
+            pl.col("pct_change").drop_nulls().len().alias("Trades"),
+            pl.col("pct_change").mean().alias("AvgPct"),
+        )
+        .sort("File")
+        .collect()
+    )
+
+    # Flat table of closed trades with the year used for grouping
+    closed = (
+        lf.filter(pl.col("pct_change").is_not_null())
+        .with_columns(
+            pl.coalesce([pl.col("exit_date"), pl.col("entry_date")])
+            .str.to_datetime(strict=False)
+            .dt.year()
+            .alias("Year")
+        )
+        .select("pct_change", "market", "Year")
+        .collect()
+    )
+
+    summary_rows = [
+        {"File": os.path.basename(file), "Trades": trades, "Avg % Change": avg}
+        for file, trades, avg in per_file.iter_rows()
+    ]
+
+    return (
+        summary_rows,
+        closed["pct_change"].to_list(),
+        closed["market"].to_list(),
+        closed["Year"].to_list(),
+    )
+
+
+def aggregate_from_parquet(path: str) -> Tuple[List[Dict], List[float], List[str], List[int]]:
+    """
+    Aggregate the combined Parquet results file written by manager.main.
+
+    One columnar read replaces the whole glob-and-loop over per-ticker
+    CSVs; the per-file summary rows are grouped from the Ticker column.
+    Returns the same tuple as aggregate_with_polars.
+    """
+    df = pd.read_parquet(
+        path, columns=["Ticker", "pct_change", "market", "entry_date", "exit_date"]
+    )
+
+    per_file = df.groupby("Ticker")["pct_change"].agg(["count", "mean"]).sort_index()
+    summary_rows = [
+        {"File": ticker, "Trades": int(count), "Avg % Change": mean if count else None}
+        for ticker, count, mean in zip(per_file.index, per_file["count"], per_file["mean"])
+    ]
+
+    closed = df[df["pct_change"].notna()]
+    dates = closed["exit_date"].combine_first(closed["entry_date"])
+
+    return (
+        summary_rows,
+        closed["pct_change"].tolist(),
+        closed["market"].tolist(),
+        dates.dt.year.tolist(),
+    )
+
+
+def aggregate_with_dataset(result_files: List[str]) -> Tuple[List[Dict], List[float], List[str], List[int]]:
+    """
+    Aggregate result files through pyarrow.dataset.
+
+    Fallback for environments without Polars: the null filter and column
+    projection are pushed into Arrow's multithreaded scanner, so only the
+    four needed columns of closed trades are ever materialized. Returns
+    the same tuple as aggregate_with_polars.
+    """
+    dset = ds.dataset(sorted(result_files), format="csv")
+
+    # Per-file summary rows from one projected column per fragment
+    summary_rows = []
+    for fragment in dset.get_fragments():
+        pcts = fragment.to_table(columns=["pct_change"]).column("pct_change")
+        closed_pcts = pcts.drop_null()
+        avg = pc.mean(closed_pcts).as_py() if len(closed_pcts) else None
+        summary_rows.append({
+            "File": os.path.basename(fragment.path),
+            "Trades": len(closed_pcts),
+            "Avg % Change": avg
+        })
+
+    table = dset.to_table(
+        filter=ds.field("pct_change").is_valid(),
+        columns=["pct_change", "market", "entry_date", "exit_date"]
+    )
+    closed = table.to_pandas()
+
+    dates = pd.to_datetime(
+        closed["exit_date"].combine_first(closed["entry_date"]), errors="coerce"
+    )
+
+    return (
+        summary_rows,
+        closed["pct_change"].tolist(),
+        closed["market"].tolist(),
+        dates.dt.year.tolist(),
+    )
+
+
 def calculate_portfolio_performance(all_pcts: List[float]) -> Dict:
     """Calculate portfolio performance metrics."""
     if not all_pcts:
         raise ValueError("No trades to analyze")
-    
-    total_trades = len(all_pcts)
-    avg_pct = sum(all_pcts) / total_trades
+
+    # Single array conversion, then vectorized reductions instead of
+    # Python-level sums over the list
+    pcts = np.asarray(all_pcts, dtype=np.float64)
+    total_trades = pcts.size
+    avg_pct = float(pcts.mean())
     capital_per_trade = TOTAL_CAPITAL / total_trades
-    
+
     # Calculate final amount
-    final_amount = sum(capital_per_trade * (1 + pct / 100) for pct in all_pcts)
-    
+    final_amount = float(np.sum(capital_per_trade * (1 + pcts / 100)))
+
     # Calculate win rate
-    winning_trades = sum(1 for pct in all_pcts if pct > 0)
+    winning_trades = int(np.count_nonzero(pcts > 0))
     win_rate = (winning_trades / total_trades) * 100
     
     return {
@@ -102,32 +239,45 @@ def calculate_portfolio_performance(all_pcts: List[float]) -> Dict:
     }
 
 
-def create_market_summary(all_markets: List[str], all_pcts: List[float]) -> pd.DataFrame:
-    """Create market performance summary."""
-    market_df = pd.DataFrame({
+def build_trades_frame(all_years: List[int], all_markets: List[str],
+                       all_pcts: List[float]) -> pd.DataFrame:
+    """
+    Build the closed-trades table shared by both summary builders.
+
+    Constructed once from the parallel lists so the market and year
+    summaries group over the same frame instead of each assembling its own.
+    The precomputed boolean Win column keeps the WinRate aggregation native
+    instead of a Python lambda applied per group.
+    """
+    trades_df = pd.DataFrame({
+        "Year": all_years,
         "Market": all_markets,
         "PctChange": all_pcts
     })
-    
-    return market_df.groupby("Market").agg(
+    trades_df["Win"] = (trades_df["PctChange"] > 0).astype(np.float32)
+    return trades_df
+
+
+def create_market_summary(trades_df: pd.DataFrame) -> pd.DataFrame:
+    """Create market performance summary."""
+    summary = trades_df.groupby("Market").agg(
         Trades=("PctChange", "count"),
         AvgPctChange=("PctChange", "mean"),
-        WinRate=("PctChange", lambda x: (x > 0).mean() * 100)
+        WinRate=("Win", "mean")
     ).reset_index().sort_values("AvgPctChange", ascending=False)
+    summary["WinRate"] *= 100
+    return summary
 
 
-def create_year_summary(all_years: List[int], all_pcts: List[float]) -> pd.DataFrame:
+def create_year_summary(trades_df: pd.DataFrame) -> pd.DataFrame:
     """Create yearly performance summary."""
-    year_df = pd.DataFrame({
-        "Year": all_years,
-        "PctChange": all_pcts
-    })
-    
-    return year_df.groupby("Year").agg(
+    summary = trades_df.groupby("Year").agg(
         Trades=("PctChange", "count"),
         AvgPctChange=("PctChange", "mean"),
-        WinRate=("PctChange", lambda x: (x > 0).mean() * 100)
+        WinRate=("Win", "mean")
     ).reset_index().sort_values("Year")
+    summary["WinRate"] *= 100
+    return summary
 
 
 def print_summary_tables(portfolio_metrics: Dict, market_summary: pd.DataFrame, 
@@ -150,35 +300,39 @@ def print_summary_tables(portfolio_metrics: Dict, market_summary: pd.DataFrame,
     print("=" * 60)
     print(f"{'Market':<15} {'Trades':>8} {'Avg %':>10} {'Win Rate':>10}")
     print("-" * 60)
-    for _, row in market_summary.iterrows():
-        print(f"{row['Market']:<15} {row['Trades']:>8} {row['AvgPctChange']:>9.2f}% "
-              f"{row['WinRate']:>9.1f}%")
+    # zip over the columns directly - iterrows would build a Series per row
+    for market, trades, avg, win in zip(market_summary["Market"], market_summary["Trades"],
+                                        market_summary["AvgPctChange"], market_summary["WinRate"]):
+        print(f"{market:<15} {trades:>8} {avg:>9.2f}% {win:>9.1f}%")
 
     # Year summary  
     print("\n📅 Performance by Year:")
     print("=" * 50)
     print(f"{'Year':<8} {'Trades':>8} {'Avg %':>10} {'Win Rate':>10}")
     print("-" * 50)
-    for _, row in year_summary.iterrows():
-        print(f"{int(row['Year']):<8} {row['Trades']:>8} {row['AvgPctChange']:>9.2f}% "
-              f"{row['WinRate']:>9.1f}%")
+    for year, trades, avg, win in zip(year_summary["Year"], year_summary["Trades"],
+                                      year_summary["AvgPctChange"], year_summary["WinRate"]):
+        print(f"{int(year):<8} {trades:>8} {avg:>9.2f}% {win:>9.1f}%")
 
 
 def save_reports(summary_rows: List[Dict], market_summary: pd.DataFrame, 
                 year_summary: pd.DataFrame) -> None:
     """Save all summary reports to CSV files."""
     try:
-        # Main summary
+        # Main summary - Arrow's vectorized writer instead of pandas to_csv
         summary_df = pd.DataFrame(summary_rows)
-        summary_df.to_csv("summary_report.csv", index=False)
+        pacsv.write_csv(pa.Table.from_pandas(summary_df, preserve_index=False),
+                        "summary_report.csv")
         logger.info("Summary report saved to 'summary_report.csv'")
 
         # Market summary
-        market_summary.to_csv("market_summary_report.csv", index=False)
+        pacsv.write_csv(pa.Table.from_pandas(market_summary, preserve_index=False),
+                        "market_summary_report.csv")
         logger.info("Market summary saved to 'market_summary_report.csv'")
 
         # Year summary
-        year_summary.to_csv("year_summary_report.csv", index=False)
+        pacsv.write_csv(pa.Table.from_pandas(year_summary, preserve_index=False),
+                        "year_summary_report.csv")
         logger.info("Year summary saved to 'year_summary_report.csv'")
         
     except Exception as e:
@@ -199,28 +353,19 @@ def cleanup_result_files(result_files: List[str]) -> None:
 def main():
     """Main function to process backtest results and generate reports."""
     try:
-        # Load result files
-        result_files = load_backtest_results()
-
-        # Process all files
-        summary_rows = []
-        all_pcts = []
-        all_markets = []
-        all_years = []
-
-        for file_path in result_files:
-            result = process_result_file(file_path)
-            
-            if result is not None:
-                summary_rows.append({
-                    "File": result["filename"],
-                    "Trades": result["trades"],
-                    "Avg % Change": result["avg_pct"]
-                })
-                
-                all_pcts.extend(result["pct_list"])
-                all_markets.extend(result["market_list"])
-                all_years.extend(result["years"])
+        # Prefer the combined Parquet file from the current manager; fall
+        # back to globbing legacy per-ticker CSVs (lazy Polars scan when
+        # available, Arrow dataset scanner otherwise)
+        if os.path.exists(BACKTEST_RESULTS_FILE):
+            result_files = [BACKTEST_RESULTS_FILE]
+            summary_rows, all_pcts, all_markets, all_years = \
+                aggregate_from_parquet(BACKTEST_RESULTS_FILE)
+        elif pl is not None:
+            result_files = load_backtest_results()
+            summary_rows, all_pcts, all_markets, all_years = aggregate_with_polars()
+        else:
+            result_files = load_backtest_results()
+            summary_rows, all_pcts, all_markets, all_years = aggregate_with_dataset(result_files)
 
         if not all_pcts:
             logger.error("No closed trades found in any files.")
@@ -236,9 +381,10 @@ def main():
             "Avg % Change": portfolio_metrics["avg_pct"]
         })
 
-        # Create summaries
-        market_summary = create_market_summary(all_markets, all_pcts)
-        year_summary = create_year_summary(all_years, all_pcts)
+        # Create summaries from one shared closed-trades frame
+        trades_df = build_trades_frame(all_years, all_markets, all_pcts)
+        market_summary = create_market_summary(trades_df)
+        year_summary = create_year_summary(trades_df)
 
         # Display results
         print_summary_tables(portfolio_metrics, market_summary, year_summary)
@@ -1,9 +1,29 @@
+import numpy as np
 import pandas as pd
 from analyzer import analyze_stock_backtest
 from datetime import datetime, timedelta
 import glob
 import os
 
+# Suffix-to-market table hoisted to module scope so it is built once
+_SUFFIX_TO_MARKET = {
+    "NS": "India",
+    "DE": "Germany",
+    "PA": "France",
+    "MI": "Italy",
+    "AS": "Netherlands",
+    "L": "UK",
+    "SS": "China",
+    "SZ": "China",
+    "T": "Japan",
+    "HK": "Hong Kong",
+    "TW": "Taiwan",
+    "KS": "South Korea",
+    "TA": "Tel Aviv",
+    "IL": "Israel"
+}
+
+
 # Function to get market from filename
 def get_market_from_filename(filename):
     """
@@ -15,31 +35,13 @@ def get_market_from_filename(filename):
     Returns:
         str: The market name or "Unknown" if not found.
     """
-    suffix_to_market = {
-        "NS": "India",
-        "DE": "Germany",
-        "PA": "France",
-        "MI": "Italy",
-        "AS": "Netherlands",
-        "L": "UK",
-        "SS": "China",
-        "SZ": "China",
-        "T": "Japan",
-        "HK": "Hong Kong",
-        "TW": "Taiwan",
-        "KS": "South Korea",
-        "TA": "Tel Aviv",
-        "IL": "Israel"
-    }
-
-    ticker_part = filename.split("_")[0]
-
-    if "." not in ticker_part:
+    ticker_part, _, _ = filename.partition("_")
+    _, sep, suffix = ticker_part.rpartition(".")
+
+    if not sep:
         return "USA"
 
-    suffix = ticker_part.split(".")[-1]
-    market = suffix_to_market.get(suffix.upper(), "Unknown")
-    return market
+    return _SUFFIX_TO_MARKET.get(suffix.upper(), "Unknown")
 
 # Find all CSV files in the data folder
 csv_files = glob.glob("data/*.csv")
@@ -117,36 +119,58 @@ for file_path in csv_files:
                 "market": market
             })
 
-    # Simulate trades
-    for idx, row in df.iterrows():
-        current_date = row["Date"]
-        low = row["Low"]
-        high = row["High"]
-        for pos in positions:
-            if pos["status"] != "OPEN":
-                continue
-
-            # Update stop loss based on max price
-            if high > pos["max_price"]:
-                pos["max_price"] = high
-                pos["stop_loss"] = pos["max_price"] - (ATR_MULTIPLE * pos["atr"])
-
-            # Check exit conditions
-            if current_date > pos["expiry_date"]:
-                pos["status"] = "EXIT TIME"
-                pos["exit_date"] = current_date
-                pos["exit_price"] = row["Close"]
-                pos["pct_change"] = ((pos["exit_price"] - pos["entry_price"]) / pos["entry_price"]) * 100
-            elif low <= pos["stop_loss"]:
-                pos["status"] = "STOP LOSS"
-                pos["exit_date"] = current_date
-                pos["exit_price"] = pos["stop_loss"]
-                pos["pct_change"] = ((pos["exit_price"] - pos["entry_price"]) / pos["entry_price"]) * 100
-            elif high >= pos["take_profit"]:
-                pos["status"] = "TAKE PROFIT"
-                pos["exit_date"] = current_date
-                pos["exit_price"] = pos["take_profit"]
-                pos["pct_change"] = ((pos["exit_price"] - pos["entry_price"]) / pos["entry_price"]) * 100
+    # Simulate trades - one vectorized pass per position instead of a
+    # Python loop over every bar: the trailing stop comes from a running
+    # max of the highs and np.argmax finds the first triggering bar
+    sim_dates = df["Date"].to_numpy()
+    sim_lows = df["Low"].to_numpy()
+    sim_highs = df["High"].to_numpy()
+    sim_closes = df["Close"].to_numpy()
+    n_bars = len(sim_dates)
+
+    for pos in positions:
+        start = np.searchsorted(sim_dates, np.datetime64(pos["entry_date"]), side="left")
+        if start >= n_bars:
+            continue
+
+        bar_dates = sim_dates[start:]
+        bar_highs = sim_highs[start:]
+        bar_lows = sim_lows[start:]
+
+        running_max = np.maximum(np.maximum.accumulate(bar_highs), pos["entry_price"])
+        stops = running_max - (ATR_MULTIPLE * pos["atr"])
+
+        expired = bar_dates > np.datetime64(pos["expiry_date"])
+        hit_stop = bar_lows <= stops
+        hit_tp = bar_highs >= pos["take_profit"]
+
+        n = len(bar_dates)
+        first_expiry = np.argmax(expired) if expired.any() else n
+        first_stop = np.argmax(hit_stop) if hit_stop.any() else n
+        first_tp = np.argmax(hit_tp) if hit_tp.any() else n
+
+        first = min(first_expiry, first_stop, first_tp)
+        if first == n:
+            pos["max_price"] = running_max[-1]
+            pos["stop_loss"] = stops[-1]
+            continue
+
+        pos["max_price"] = running_max[first]
+        pos["stop_loss"] = stops[first]
+        pos["exit_date"] = bar_dates[first]
+
+        # Exit conditions in the original priority order
+        if first == first_expiry:
+            pos["status"] = "EXIT TIME"
+            pos["exit_price"] = sim_closes[start + first]
+        elif first == first_stop:
+            pos["status"] = "STOP LOSS"
+            pos["exit_price"] = stops[first]
+        else:
+            pos["status"] = "TAKE PROFIT"
+            pos["exit_price"] = pos["take_profit"]
+
+        pos["pct_change"] = ((pos["exit_price"] - pos["entry_price"]) / pos["entry_price"]) * 100
 
     # Save results to CSV
     results_df = pd.DataFrame(positions)
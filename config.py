@@ -27,6 +27,7 @@ DEFAULT_INTERVAL = "1d"
 DEFAULT_TICKER_FILE = "tickers.txt"
 DATA_DIRECTORY = "data"
 BACKTEST_RESULTS_PREFIX = "backtest_results_"
+BACKTEST_RESULTS_FILE = "backtest_results.parquet"
 
 # Market Mappings
 MARKET_SUFFIXES = {
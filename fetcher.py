@@ -1,4 +1,5 @@
 import yfinance as yf
+import pandas as pd
 import logging
 from typing import Dict, List, Optional
 from config import DEFAULT_PERIOD, DEFAULT_INTERVAL
@@ -35,31 +36,54 @@ def fetch_data(tickers: List[str], period: str = DEFAULT_PERIOD) -> Dict:
     
     data = {}
     failed_tickers = []
-    
-    logger.info(f"Fetching data for {len(tickers)} tickers...")
-    
+
+    valid_tickers = []
     for ticker in tickers:
         if not isinstance(ticker, str) or not ticker.strip():
             logger.warning(f"Invalid ticker: {ticker}, skipping")
             continue
-            
-        ticker = ticker.strip().upper()
-        
+        valid_tickers.append(ticker.strip().upper())
+
+    if not valid_tickers:
+        logger.warning("No valid tickers to fetch")
+        return data
+
+    logger.info(f"Fetching data for {len(valid_tickers)} tickers...")
+
+    # One batched request instead of a round-trip per ticker; yfinance
+    # multiplexes the symbols over its own thread pool
+    try:
+        raw = yf.download(
+            tickers=" ".join(valid_tickers),
+            period=period,
+            interval=DEFAULT_INTERVAL,
+            group_by="ticker",
+            threads=True,
+            progress=False
+        )
+    except Exception as e:
+        logger.error(f"Batch download failed: {e}")
+        return data
+
+    for ticker in valid_tickers:
         try:
-            logger.debug(f"Fetching {ticker}...")
-            df = yf.download(
-                ticker, 
-                period=period, 
-                interval=DEFAULT_INTERVAL, 
-                progress=False
-            )
+            # With group_by="ticker" the batch frame is keyed by symbol at
+            # the top column level; a single-ticker download comes back flat
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker not in raw.columns.get_level_values(0):
+                    logger.warning(f"No data returned for {ticker}")
+                    failed_tickers.append(ticker)
+                    continue
+                df = raw[ticker].dropna(how="all")
+            else:
+                df = raw.dropna(how="all")
 
             # Validate the downloaded data
             if df.empty:
                 logger.warning(f"No data returned for {ticker}")
                 failed_tickers.append(ticker)
                 continue
-                
+
             if "Close" not in df.columns:
                 logger.warning(f"Missing 'Close' column for {ticker}")
                 failed_tickers.append(ticker)
@@ -67,21 +91,21 @@ def fetch_data(tickers: List[str], period: str = DEFAULT_PERIOD) -> Dict:
 
             # Reset index for consistency and add ticker validation
             df = df.reset_index()
-            
+
             # Basic data quality checks
             if len(df) < 20:  # Need minimum data for analysis
                 logger.warning(f"Insufficient data for {ticker} (only {len(df)} rows)")
                 failed_tickers.append(ticker)
                 continue
-                
+
             data[ticker] = df
             logger.debug(f"Successfully fetched {len(df)} rows for {ticker}")
-            
+
         except Exception as e:
             logger.error(f"Error fetching data for {ticker}: {e}")
             failed_tickers.append(ticker)
             continue
-    
+
     success_count = len(data)
     total_count = len(tickers)
     
@@ -1,17 +1,131 @@
 import yfinance as yf
+import numpy as np
 import pandas as pd
 import logging
-from typing import Optional
+from html import escape
+from math import log10
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from cachetools import TTLCache, cached
+from jinja2 import Environment
+from numba import njit
 
 logger = logging.getLogger(__name__)
 
+# Report skeleton parsed and compiled once at import; autoescape covers the
+# symbol and company names coming back from Yahoo, while the sub-tables are
+# trusted HTML built below and passed through with |safe
+_env = Environment(autoescape=True)
+_REPORT_TEMPLATE = _env.from_string("""
+        <div class="fundamental-report">
+        <h3>{{ symbol }} - Fundamental Analysis</h3>
+        <div class="company-info">
+            <p><strong>Short Name:</strong> {{ short_name }}</p>
+            <p><strong>Long Name:</strong> {{ long_name }}</p>
+        </div>
+        {{ metrics_table | safe }}{{ revenue_table | safe }}{{ additional | safe }}</div>""")
+
+# Persistent on-disk HTTP cache: responses survive process restarts, so
+# the daily scan stops re-downloading statements that change quarterly.
+# Optional - without requests-cache yfinance just uses its own session.
+try:
+    import requests_cache
+    _SESSION = requests_cache.CachedSession(
+        ".yf_cache", backend="sqlite", expire_after=86400
+    )
+except ImportError:
+    _SESSION = None
+
+# Fundamentals barely move intraday; cache them for a day so repeated
+# reports for the same symbol skip the three Yahoo round-trips
+_FUNDAMENTALS_CACHE = TTLCache(maxsize=256, ttl=86400)
+
+# The only keys the report reads out of yfinance's ~300-key info dict;
+# the rest never leaves get_fundamental_report
+_NEEDED_INFO_KEYS = (
+    "symbol", "shortName", "longName", "trailingEps", "trailingPE",
+    "marketCap", "bookValue", "dividendYield",
+)
+
+
+@lru_cache(maxsize=256)
+def _ticker(symbol: str) -> yf.Ticker:
+    """Memoize Ticker construction so repeat lookups share one object
+    (and its underlying HTTP session) per symbol."""
+    if _SESSION is not None:
+        try:
+            return yf.Ticker(symbol, session=_SESSION)
+        except Exception:
+            # Newer yfinance releases refuse caching sessions outright
+            # (YFDataException) and manage their own; fall through
+            pass
+    return yf.Ticker(symbol)
+
+
+@cached(_FUNDAMENTALS_CACHE)
+def _fetch_fundamentals(symbol: str):
+    """
+    Fetch info, financials and balance sheet for a symbol in one go.
+
+    Accessing the properties here populates the Ticker object's own memo,
+    so the returned ticker hands the same frames back without further
+    network calls. Cached per symbol with a daily TTL; errors propagate
+    uncached so transient failures can retry.
+    """
+    ticker = _ticker(symbol)
+    info = ticker.info
+    financials = ticker.financials
+    balance_sheet = ticker.balance_sheet
+    return ticker, info, financials, balance_sheet
+
+
+def prefetch_fundamentals(symbols: List[str]) -> Dict[str, tuple]:
+    """
+    Batch-fetch fundamentals for all signal tickers up front.
 
-def get_fundamental_report(symbol: str) -> str:
+    One yf.Tickers object multiplexes the symbols over a shared session,
+    and the per-symbol statement pulls run on a small thread pool, so N
+    signals cost a handful of round-trips instead of 3xN serial ones.
+    Symbols that fail are simply absent from the returned dict and fall
+    back to the per-symbol fetch in get_fundamental_report.
+    """
+    prefetched = {}
+    if not symbols:
+        return prefetched
+
+    try:
+        tickers = yf.Tickers(" ".join(symbols))
+    except Exception as e:
+        logger.warning(f"Fundamentals prefetch unavailable: {e}")
+        return prefetched
+
+    def fetch(symbol: str):
+        sym = symbol.strip().upper()
+        ticker = tickers.tickers[sym]
+        return sym, (ticker, ticker.info, ticker.financials, ticker.balance_sheet)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as executor:
+        futures = {executor.submit(fetch, symbol): symbol for symbol in symbols}
+        for future in futures:
+            try:
+                sym, bundle = future.result()
+                prefetched[sym] = bundle
+            except Exception as e:
+                logger.warning(f"Prefetch failed for {futures[future]}: {e}")
+
+    return prefetched
+
+
+def get_fundamental_report(symbol: str, prefetched: Optional[Dict[str, tuple]] = None) -> str:
     """
     Generates an HTML report of fundamental data for a given stock symbol.
 
     Parameters:
         symbol (str): Stock ticker symbol.
+        prefetched (dict, optional): Output of prefetch_fundamentals; when
+            the symbol is present no network fetch happens here.
 
     Returns:
         str: HTML string containing the fundamental report.
@@ -26,38 +140,28 @@ def get_fundamental_report(symbol: str) -> str:
     
     try:
         logger.debug(f"Fetching fundamental data for {symbol}")
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        if prefetched and symbol in prefetched:
+            _, info, financials, balance_sheet = prefetched[symbol]
+        else:
+            _, info, financials, balance_sheet = _fetch_fundamentals(symbol)
 
         if not info or 'symbol' not in info:
             logger.warning(f"No fundamental data available for {symbol}")
             return create_unavailable_report(symbol)
 
-        # Extract basic info with fallbacks
-        short_name = info.get("shortName", "N/A")
-        long_name = info.get("longName", "N/A")
-        
-        html = f"""
-        <div class="fundamental-report">
-        <h3>{symbol} - Fundamental Analysis</h3>
-        <div class="company-info">
-            <p><strong>Short Name:</strong> {short_name}</p>
-            <p><strong>Long Name:</strong> {long_name}</p>
-        </div>
-        """
+        # Shrink the huge info dict down to the handful of keys the report
+        # uses; the helpers work off this small ctx and the full dict can
+        # be collected as soon as the fetch cache drops it
+        ctx = {k: info[k] for k in _NEEDED_INFO_KEYS if k in info}
 
-        # Key metrics table
-        html += create_key_metrics_table(info)
-        
-        # Revenue table
-        html += create_revenue_table(ticker, symbol)
-        
-        # Additional metrics
-        html += create_additional_metrics(ticker, info)
-        
-        html += "</div>"
-        
-        return html
+        return _REPORT_TEMPLATE.render(
+            symbol=symbol,
+            short_name=ctx.get("shortName", "N/A"),
+            long_name=ctx.get("longName", "N/A"),
+            metrics_table=create_key_metrics_table(ctx),
+            revenue_table=create_revenue_table(financials, symbol),
+            additional=create_additional_metrics(financials, balance_sheet, ctx),
+        )
 
     except Exception as e:
         logger.error(f"Error generating fundamental report for {symbol}: {e}")
@@ -68,36 +172,49 @@ def create_unavailable_report(symbol: str) -> str:
     """Create report when fundamental data is unavailable."""
     return f"""
     <div class="fundamental-report">
-    <h3>{symbol} - Fundamental Analysis</h3>
+    <h3>{escape(symbol)} - Fundamental Analysis</h3>
     <p class="warning">⚠️ Fundamental data not available for this symbol.</p>
     </div>
     """
 
 
 def create_error_report(symbol: str, error_msg: str) -> str:
-    """Create report when an error occurs.""" 
+    """Create report when an error occurs."""
     return f"""
     <div class="fundamental-report">
-    <h3>{symbol} - Fundamental Analysis</h3>
-    <p class="error">❌ Error retrieving data: {error_msg}</p>
+    <h3>{escape(symbol)} - Fundamental Analysis</h3>
+    <p class="error">❌ Error retrieving data: {escape(error_msg)}</p>
     </div>
     """
 
 
+# Thousands-group suffixes indexed by int(log10(x)) // 3
+_MCAP_SUFFIXES = ('', 'K', 'M', 'B', 'T')
+
+
+@lru_cache(maxsize=4096)
+def _fmt_mcap(cap: int) -> str:
+    """Format a positive market cap with a magnitude suffix, memoized.
+
+    The same watchlist rescanned daily mostly repeats caps, so the log10
+    and f-string work collapses to a dict lookup on repeat calls.
+    """
+    i = min(len(_MCAP_SUFFIXES) - 1, int(log10(cap)) // 3)
+    return f"${cap / 10 ** (3 * i):,.2f}{_MCAP_SUFFIXES[i]}"
+
+
 def create_key_metrics_table(info: dict) -> str:
     """Create table of key financial metrics."""
     eps = info.get("trailingEps", "N/A")
     pe_ratio = info.get("trailingPE", "N/A")
     market_cap = info.get("marketCap", "N/A")
-    
-    # Format market cap if available
+
+    # Format market cap if available - the magnitude picks the suffix
+    # straight from the table, no comparison ladder; degenerate caps
+    # (zero or negative) can't take log10 but still render formatted
     if isinstance(market_cap, (int, float)):
-        if market_cap > 1e12:
-            market_cap = f"${market_cap/1e12:.2f}T"
-        elif market_cap > 1e9:
-            market_cap = f"${market_cap/1e9:.2f}B"
-        elif market_cap > 1e6:
-            market_cap = f"${market_cap/1e6:.2f}M"
+        if market_cap > 0:
+            market_cap = _fmt_mcap(int(market_cap))
         else:
             market_cap = f"${market_cap:,.0f}"
     
@@ -111,100 +228,122 @@ def create_key_metrics_table(info: dict) -> str:
     """
 
 
-def create_revenue_table(ticker, symbol: str) -> str:
-    """Create revenue and income table."""
+def create_revenue_table(income_stmt: Optional[pd.DataFrame], symbol: str) -> str:
+    """Create revenue and income table from a pre-fetched income statement."""
     try:
-        income_stmt = ticker.financials
-        if income_stmt.empty:
+        if income_stmt is None or income_stmt.empty:
             return "<p><i>Financial data not available.</i></p>"
-            
-        revenues = income_stmt.loc["Total Revenue"] if "Total Revenue" in income_stmt.index else None
-        net_incomes = income_stmt.loc["Net Income"] if "Net Income" in income_stmt.index else None
 
-        if revenues is None:
+        # Resolve both labels in one indexer pass instead of a hashed .loc
+        # lookup (and Series build) per label
+        rows = income_stmt.index.get_indexer(["Total Revenue", "Net Income"])
+        if rows[0] == -1:
             return "<p><i>Revenue data not available.</i></p>"
 
-        html = """
+        parts = ["""
         <h4>📊 Revenue & Net Income (Annual)</h4>
         <table class="financial-table">
           <tr><th>Year</th><th>Revenue</th><th>Net Income</th><th>YoY Growth</th></tr>
-        """
-
-        last_rev = None
-        # Sort by date descending (most recent first)
-        for date in sorted(revenues.index, reverse=True)[:4]:  # Last 4 years
-            rev = revenues[date]
-            ni = net_incomes.get(date, None) if net_incomes is not None else None
-            
-            # Format values
-            ni_text = f"${ni:,.0f}" if ni and not pd.isna(ni) else "N/A"
-            rev_text = f"${rev:,.0f}" if rev and not pd.isna(rev) else "N/A"
-            
-            # Calculate YoY growth
-            growth = "N/A"
-            if last_rev and not pd.isna(rev) and not pd.isna(last_rev) and last_rev != 0:
-                growth_pct = ((rev - last_rev) / last_rev) * 100
-                growth = f"{growth_pct:+.1f}%"
-            
-            html += f"""
+        """]
+
+        # Sort by date descending (most recent first), last 4 years; one
+        # ndarray block serves both rows
+        dates = sorted(income_stmt.columns, reverse=True)[:4]
+        block = income_stmt[dates].to_numpy(dtype=np.float64)
+        rev = block[rows[0]]
+        ni = block[rows[1]] if rows[1] != -1 else np.full(rev.size, np.nan)
+
+        # YoY growth vs the row above, vectorized; entries with a missing
+        # or zero comparison revenue stay NaN and render as N/A
+        prev = rev[:-1]
+        growth = np.full(rev.size, np.nan)
+        valid = ~np.isnan(rev[1:]) & ~np.isnan(prev) & (prev != 0)
+        np.divide(rev[1:] - prev, prev, out=growth[1:], where=valid)
+
+        for date, rev_val, ni_val, growth_val in zip(dates, rev, ni, growth):
+            rev_text = f"${rev_val:,.0f}" if rev_val and not np.isnan(rev_val) else "N/A"
+            ni_text = f"${ni_val:,.0f}" if ni_val and not np.isnan(ni_val) else "N/A"
+            growth_text = f"{growth_val * 100:+.1f}%" if not np.isnan(growth_val) else "N/A"
+
+            parts.append(f"""
             <tr>
                 <td>{date.year}</td>
                 <td>{rev_text}</td>
                 <td>{ni_text}</td>
-                <td>{growth}</td>
+                <td>{growth_text}</td>
             </tr>
-            """
-            last_rev = rev
+            """)
 
-        html += "</table>"
-        return html
+        parts.append("</table>")
+        return "".join(parts)
 
     except Exception as e:
         logger.warning(f"Error creating revenue table for {symbol}: {e}")
         return "<p><i>Revenue data not available.</i></p>"
 
 
-def create_additional_metrics(ticker, info: dict) -> str:
-    """Create additional financial metrics."""
+@njit(cache=True)
+def _fund_ratios(ni: float, rev: float, tl: float, eq: float):
+    """
+    Compute net profit margin (%) and debt/equity from raw statement
+    scalars in native code; NaN inputs or zero denominators come back as
+    NaN so the caller can skip rendering that line.
+
+    Trivial per report, but backtests sweeping thousands of tickers call
+    this in a tight loop where the compiled version keeps the arithmetic
+    off the interpreter.
+    """
+    margin = ni / rev * 100.0 if rev != 0.0 else np.nan
+    de = tl / eq if eq != 0.0 else np.nan
+    return margin, de
+
+
+def create_additional_metrics(income_stmt: Optional[pd.DataFrame],
+                              balance: Optional[pd.DataFrame], info: dict) -> str:
+    """Create additional financial metrics from pre-fetched statements."""
     try:
-        metrics_html = "<h4>📈 Additional Metrics</h4><ul>"
-        
-        # Net Profit Margin
+        parts = ["<h4>📈 Additional Metrics</h4><ul>"]
+
+        # Pull the four statement scalars (one indexer pass and iat access
+        # per frame), then hand the ratio math to the compiled kernel;
+        # anything missing stays NaN and drops out of the report
+        ni = rev = tl = eq = np.nan
         try:
-            income_stmt = ticker.financials
-            if not income_stmt.empty and "Net Income" in income_stmt.index and "Total Revenue" in income_stmt.index:
-                ni = income_stmt.loc["Net Income"].iloc[0]
-                rev = income_stmt.loc["Total Revenue"].iloc[0]
-                if rev != 0 and not pd.isna(ni) and not pd.isna(rev):
-                    net_margin = (ni / rev) * 100
-                    metrics_html += f"<li><strong>Net Profit Margin:</strong> {net_margin:.2f}%</li>"
-        except:
-            pass
+            if income_stmt is not None and not income_stmt.empty:
+                rows = income_stmt.index.get_indexer(["Net Income", "Total Revenue"])
+                if rows[0] != -1 and rows[1] != -1:
+                    ni = np.float64(income_stmt.iat[rows[0], 0])
+                    rev = np.float64(income_stmt.iat[rows[1], 0])
+        except (KeyError, AttributeError, TypeError, ValueError) as e:
+            logger.debug(f"Income statement metrics unavailable: {e}")
 
-        # Debt/Equity and ROE
         try:
-            balance = ticker.balance_sheet
-            if not balance.empty and "Total Liab" in balance.index and "Total Stockholder Equity" in balance.index:
-                tl = balance.loc["Total Liab"].iloc[0]
-                eq = balance.loc["Total Stockholder Equity"].iloc[0]
-                if eq != 0 and not pd.isna(tl) and not pd.isna(eq):
-                    de = tl / eq
-                    metrics_html += f"<li><strong>Debt/Equity Ratio:</strong> {de:.2f}</li>"
-        except:
-            pass
+            if balance is not None and not balance.empty:
+                rows = balance.index.get_indexer(["Total Liab", "Total Stockholder Equity"])
+                if rows[0] != -1 and rows[1] != -1:
+                    tl = np.float64(balance.iat[rows[0], 0])
+                    eq = np.float64(balance.iat[rows[1], 0])
+        except (KeyError, AttributeError, TypeError, ValueError) as e:
+            logger.debug(f"Balance sheet metrics unavailable: {e}")
+
+        net_margin, de = _fund_ratios(ni, rev, tl, eq)
+        if not np.isnan(net_margin):
+            parts.append(f"<li><strong>Net Profit Margin:</strong> {net_margin:.2f}%</li>")
+        if not np.isnan(de):
+            parts.append(f"<li><strong>Debt/Equity Ratio:</strong> {de:.2f}</li>")
 
         # Book Value Per Share
         book_value = info.get("bookValue")
         if book_value:
-            metrics_html += f"<li><strong>Book Value/Share:</strong> ${book_value:.2f}</li>"
+            parts.append(f"<li><strong>Book Value/Share:</strong> ${book_value:.2f}</li>")
 
         # Dividend Yield
         div_yield = info.get("dividendYield")
         if div_yield:
-            metrics_html += f"<li><strong>Dividend Yield:</strong> {div_yield*100:.2f}%</li>"
+            parts.append(f"<li><strong>Dividend Yield:</strong> {div_yield*100:.2f}%</li>")
 
-        metrics_html += "</ul>"
-        return metrics_html
+        parts.append("</ul>")
+        return "".join(parts)
 
     except Exception as e:
         logger.warning(f"Error creating additional metrics: {e}")
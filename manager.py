@@ -1,11 +1,14 @@
 import os
 import logging
+from pathlib import Path
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import List, Dict, Optional
 from fetcher import fetch_data
 from analyzer import analyze_stock
 from notifier import send_email_alert
 from dotenv import load_dotenv
-from fund import get_fundamental_report
+from fund import get_fundamental_report, prefetch_fundamentals
 from config import DEFAULT_TICKER_FILE
 
 # Configure logging
@@ -32,21 +35,22 @@ def extract_single_ticker_df(df, ticker: str):
         raise ValueError("Ticker must be a non-empty string")
         
     try:
-        columns_to_select = [
-            ('Date', ''),
-            ('Open', ticker),
-            ('High', ticker),
-            ('Low', ticker),
-            ('Close', ticker),
-            ('Volume', ticker),
-        ]
-
-        df_selected = df.loc[:, columns_to_select]
-        df_selected.columns = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+        # fetch_data downloads with group_by='ticker', putting the ticker
+        # on the outer column level, so df[ticker] hands back the grouped
+        # sub-frame directly - the fastest MultiIndex slicing path. Frames
+        # grouped the other way round (field outer, ticker inner) still go
+        # through a level cross-section.
+        if ticker in df.columns.get_level_values(0):
+            df_selected = df[ticker]
+        else:
+            df_selected = df.xs(ticker, level=1, axis=1)
+        df_selected = df_selected[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+        date = df[('Date', '')] if ('Date', '') in df.columns else df.index
+        df_selected.insert(0, 'Date', date)
 
         if df_selected.empty:
             raise ValueError(f"No data found for ticker {ticker}")
-            
+
         return df_selected
         
     except KeyError as e:
@@ -63,9 +67,11 @@ def load_tickers_from_file(ticker_file: str = DEFAULT_TICKER_FILE) -> List[str]:
         raise FileNotFoundError(f"Ticker file '{ticker_file}' not found.")
 
     try:
-        with open(ticker_file, 'r') as f:
-            tickers = [line.strip().upper() for line in f if line.strip()]
-        
+        # One read + splitlines instead of line-by-line iteration; the
+        # map/filter chain strips, uppercases and drops blanks in C
+        lines = Path(ticker_file).read_text().splitlines()
+        tickers = list(filter(None, map(str.upper, map(str.strip, lines))))
+
         if not tickers:
             raise ValueError("No tickers found in file.")
             
@@ -87,36 +93,76 @@ def validate_email_config(email_password: str, sender_email: str, recipient_emai
         raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
 
 
+def _analyze_one(item) -> Optional[str]:
+    """
+    Analyze one (ticker, df) pair and return the ticker if it signals.
+
+    Module-level so it pickles cleanly into ProcessPoolExecutor workers;
+    failures are swallowed per ticker so one bad frame doesn't sink the
+    whole batch.
+    """
+    ticker, df = item
+    try:
+        signals_list = analyze_stock(
+            df,
+            volume_multiplier=4.0,
+            breakout_days=12,
+            max_days_old=1
+        )
+        return ticker if signals_list else None
+    except Exception as e:
+        logger.error(f"Error analyzing {ticker}: {e}")
+        return None
+
+
 def analyze_tickers_for_signals(tickers: List[str], data: Dict) -> List[str]:
     """Analyze tickers and return those with signals."""
-    signals = []
-    
+    # Extraction is cheap, so prepare the per-ticker frames here and fan
+    # only the CPU-bound analyze_stock calls out across cores
+    items = []
     for ticker in tickers:
+        df = data.get(ticker)
+        if df is None:
+            logger.warning(f"No data available for {ticker}")
+            continue
+
         try:
-            df = data.get(ticker)
-            if df is None:
-                logger.warning(f"No data available for {ticker}")
-                continue
-                
-            df_clean = extract_single_ticker_df(df, ticker)
-            signals_list = analyze_stock(
-                df_clean,
-                volume_multiplier=4.0,
-                breakout_days=12,
-                max_days_old=1
-            )
-            
-            if signals_list:
-                signals.append(ticker)
-                logger.info(f"Signal found for {ticker}")
-                
+            # The batched fetch hands out flat per-ticker frames already;
+            # only legacy MultiIndex frames still need extraction
+            if isinstance(df.columns, pd.MultiIndex):
+                df = extract_single_ticker_df(df, ticker)
         except Exception as e:
-            logger.error(f"Error analyzing {ticker}: {e}")
+            logger.error(f"Error extracting data for {ticker}: {e}")
             continue
-    
+
+        items.append((ticker, df))
+
+    if not items:
+        return []
+
+    # Small watchlists aren't worth the worker spawn + pickling overhead
+    if len(items) < 8:
+        results = map(_analyze_one, items)
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(_analyze_one, items, chunksize=8))
+
+    signals = [ticker for ticker in results if ticker is not None]
+    for ticker in signals:
+        logger.info(f"Signal found for {ticker}")
     return signals
 
 
+def fetch_fundamental_report(ticker: str, prefetched: Optional[Dict] = None) -> str:
+    """Fetch one fundamental report, degrading to a placeholder on failure
+    so a single bad symbol doesn't poison the batch."""
+    try:
+        return get_fundamental_report(ticker, prefetched)
+    except Exception as e:
+        logger.warning(f"Could not generate fundamental report for {ticker}: {e}")
+        return f"<p>Report unavailable for {ticker}</p>"
+
+
 def main():
     """
     Main function to fetch stock data, analyze for buy signals, and send email alerts.
@@ -148,14 +194,13 @@ def main():
             logger.info(f"Found signals for {len(signals)} stocks: {', '.join(signals)}")
             
             try:
-                html_reports = []
-                for ticker in signals:
-                    try:
-                        report = get_fundamental_report(ticker)
-                        html_reports.append(report)
-                    except Exception as e:
-                        logger.warning(f"Could not generate fundamental report for {ticker}: {e}")
-                        html_reports.append(f"<p>Report unavailable for {ticker}</p>")
+                # Batch-fetch the fundamentals once, then build the reports
+                # over threads; results keep the signal order
+                prefetched = prefetch_fundamentals(signals)
+                with ThreadPoolExecutor(max_workers=min(8, len(signals))) as executor:
+                    html_reports = list(executor.map(
+                        lambda ticker: fetch_fundamental_report(ticker, prefetched),
+                        signals))
 
                 send_email_alert(
                     tickers=signals,
@@ -1,7 +1,4 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-
+import io
 import smtplib
 import logging
 from email.mime.text import MIMEText
@@ -34,7 +31,10 @@ def validate_email_inputs(tickers: List[str], html_reports: List[str],
 
 def create_html_email_body(tickers: List[str], html_reports: List[str]) -> str:
     """Create styled HTML email body."""
-    html = """
+    # Stream fragments into one growable buffer; writelines consumes the
+    # generators lazily, so no intermediate list of fragments is kept
+    buf = io.StringIO()
+    buf.write("""
     <html>
     <head>
     <meta charset="UTF-8">
@@ -109,37 +109,78 @@ def create_html_email_body(tickers: List[str], html_reports: List[str]) -> str:
     </style>
     </head>
     <body>
-    """
+    """)
 
-    html += """
+    buf.write("""
     <div class="header">
         <h1>📈 Trading Signals Alert</h1>
         <p>New breakout opportunities detected!</p>
     </div>
-    """
+    """)
 
-    html += '<div class="signal-list">'
-    html += '<h3>🎯 Stocks with Buy Signals:</h3>'
-    for ticker in tickers:
-        html += f'<span class="signal-item">{ticker}</span>'
-    html += '</div>'
+    buf.write('<div class="signal-list">')
+    buf.write('<h3>🎯 Stocks with Buy Signals:</h3>')
+    buf.writelines(f'<span class="signal-item">{ticker}</span>' for ticker in tickers)
+    buf.write('</div>')
 
     # Add each report in its own section
-    for i, report in enumerate(html_reports):
-        if report and report.strip():
-            html += f'<div class="report-section">{report}</div>'
-        else:
-            html += f'<div class="report-section"><p>Report unavailable for {tickers[i]}</p></div>'
-
-    html += """
+    buf.writelines(
+        f'<div class="report-section">{report}</div>'
+        if report and report.strip()
+        else f'<div class="report-section"><p>Report unavailable for {ticker}</p></div>'
+        for ticker, report in zip(tickers, html_reports)
+    )
+
+    buf.write("""
     <div class="footer">
         <p>⚠️ This is an automated alert. Please conduct your own research before making investment decisions.</p>
         <p>Generated by Stock Scanner System</p>
     </div>
     </body></html>
+    """)
+
+    return buf.getvalue()
+
+
+class GmailSender:
     """
+    Context manager holding one authenticated SMTP_SSL session.
 
-    return html
+    Opening the connection and negotiating TLS dominates the cost of a
+    send, so callers that batch several alerts can reuse a single session
+    for multiple send() calls instead of reconnecting per message.
+    """
+
+    def __init__(self, sender_email: str, sender_password: str):
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.server: Optional[smtplib.SMTP_SSL] = None
+
+    def __enter__(self) -> "GmailSender":
+        logger.info(f"Connecting to {EMAIL_SMTP_SERVER}:{EMAIL_SMTP_PORT}")
+        self.server = smtplib.SMTP_SSL(EMAIL_SMTP_SERVER, EMAIL_SMTP_PORT, timeout=30)
+        try:
+            self.server.login(self.sender_email, self.sender_password)
+        except smtplib.SMTPAuthenticationError:
+            logger.error("Email authentication failed - check credentials")
+            self.server.quit()
+            self.server = None
+            raise
+        return self
+
+    def send(self, msg: MIMEMultipart) -> None:
+        """Send one prepared message over the open session."""
+        if self.server is None:
+            raise RuntimeError("GmailSender used outside its context")
+        self.server.send_message(msg)
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
 
 
 def send_email_alert(
@@ -194,18 +235,12 @@ Please conduct your own research before making investment decisions.
         msg.attach(text_part)
         msg.attach(html_part)
 
-        # Send the email
-        logger.info(f"Connecting to {EMAIL_SMTP_SERVER}:{EMAIL_SMTP_PORT}")
-        
-        with smtplib.SMTP_SSL(EMAIL_SMTP_SERVER, EMAIL_SMTP_PORT, timeout=30) as server:
+        # Send the email over a reusable authenticated session
+        with GmailSender(sender_email, sender_password) as sender:
             try:
-                server.login(sender_email, sender_password)
-                server.send_message(msg)
+                sender.send(msg)
                 logger.info("Email alert sent successfully")
-                
-            except smtplib.SMTPAuthenticationError as e:
-                logger.error("Email authentication failed - check credentials")
-                raise
+
             except smtplib.SMTPRecipientsRefused as e:
                 logger.error(f"Recipient email rejected: {recipient_email}")
                 raise